@@ -1,30 +1,71 @@
+import csv
+import hashlib
+import io
+import json
 import os
 import logging
+import queue
 import secrets
+import shutil
 import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Protocol, Optional
 
-from flask import Flask, request, render_template, redirect, url_for, flash, session, send_file
+from flask import Flask, g, request, render_template, redirect, url_for, flash, session, send_file, send_from_directory
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.utils import secure_filename
 from benford.analyzer import BenfordAnalyzer
 from benford.interpretation import interpret_results
 from benford.external_data import (
     KaggleDataSource,
-    encrypt_credentials,
-    decrypt_credentials,
+    build_cipher,
+    encrypt_with,
+    decrypt_with,
     sanitize_credential,
     ExternalDataError,
     ExternalDataAuthError,
     read_preview,
+    count_data_rows,
     ExternalDataRateLimitError,
     validate_dataset_ref,
 )
 import pandas as pd
+from cachetools import TTLCache
 from dotenv import load_dotenv
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:  # pragma: no cover - optional dependency
+    HAS_ORJSON = False
+
+try:
+    from streaming_form_data import StreamingFormDataParser
+    from streaming_form_data.targets import FileTarget, ValueTarget
+    HAS_STREAMING_FORM_DATA = True
+except ImportError:  # pragma: no cover - optional dependency
+    HAS_STREAMING_FORM_DATA = False
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:  # pragma: no cover - optional dependency
+    HAS_PIL = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    HAS_PYARROW = True
+except ImportError:  # pragma: no cover - optional dependency
+    HAS_PYARROW = False
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -33,7 +74,7 @@ STATIC_IMAGES_FOLDER = Path('static/images')
 STATIC_REPORTS_FOLDER = Path('static/reports')
 EXAMPLES_FOLDER = Path('data/examples')
 EXAMPLES_METADATA = EXAMPLES_FOLDER / 'metadata.json'
-ALLOWED_EXTENSIONS = {'csv'}
+ALLOWED_SUFFIXES = frozenset({'.csv'})
 
 
 def _get_log_level() -> int:
@@ -42,74 +83,47 @@ def _get_log_level() -> int:
     return getattr(logging, level_name, logging.INFO)
 
 
-# Configure logging
-logging.basicConfig(
-    level=_get_log_level(),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging. Records are handed off through an unbounded queue so
+# the request thread only pays a queue.put; formatting and I/O happen on
+# the listener's background thread.
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+_log_queue: 'queue.Queue' = queue.Queue(-1)
+_log_listener = QueueListener(_log_queue, _log_stream_handler, respect_handler_level=True)
+_log_listener.start()
+_log_queue_handler = QueueHandler(_log_queue)
+# QueueHandler.prepare() bakes this handler's format into record.msg before
+# the listener's StreamHandler applies the real one, so anything beyond the
+# bare message here would appear twice in every line.
+_log_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=_get_log_level(), handlers=[_log_queue_handler])
 logger = logging.getLogger(__name__)
 
 
-def _get_max_file_size() -> int:
-    """Return max upload size in bytes, defaulting to 16MB."""
-    raw_size = os.environ.get('MAX_FILE_SIZE_MB')
-    if raw_size is None:
-        return 16 * 1024 * 1024
-
+def _env(name, default, cast=int):
+    """Parse a positive numeric environment variable with a fallback default."""
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
     try:
-        size_mb = int(raw_size)
-        if size_mb <= 0:
+        value = cast(raw)
+        if value <= 0:
             raise ValueError
-        return size_mb * 1024 * 1024
+        return value
     except ValueError:
-        logger.warning("Invalid MAX_FILE_SIZE_MB '%s'; falling back to 16MB.", raw_size)
-        return 16 * 1024 * 1024
-
-
-def _get_retention_age() -> timedelta:
-    """Return file retention age, defaulting to 24 hours."""
-    raw_hours = os.environ.get('MAX_FILE_RETENTION_HOURS')
-    if raw_hours is None:
-        return timedelta(hours=24)
-    try:
-        hours = float(raw_hours)
-        if hours <= 0:
-            raise ValueError
-        return timedelta(hours=hours)
-    except ValueError:
-        logger.warning("Invalid MAX_FILE_RETENTION_HOURS '%s'; using 24h.", raw_hours)
-        return timedelta(hours=24)
-
-
-def _get_cleanup_interval() -> timedelta:
-    """Return cleanup interval, defaulting to 60 minutes."""
-    raw_minutes = os.environ.get('CLEANUP_INTERVAL_MINUTES')
-    if raw_minutes is None:
-        return timedelta(minutes=60)
-    try:
-        minutes = float(raw_minutes)
-        if minutes <= 0:
-            raise ValueError
-        return timedelta(minutes=minutes)
-    except ValueError:
-        logger.warning("Invalid CLEANUP_INTERVAL_MINUTES '%s'; using 60m.", raw_minutes)
-        return timedelta(minutes=60)
-
-
-MAX_FILE_SIZE = _get_max_file_size()
-RETENTION_AGE = _get_retention_age()
-CLEANUP_INTERVAL = _get_cleanup_interval()
-try:
-    RATE_LIMIT_REQUESTS = max(1, int(os.environ.get('RATE_LIMIT_REQUESTS', 30)))
-except ValueError:
-    logger.warning("Invalid RATE_LIMIT_REQUESTS env; using 30.")
-    RATE_LIMIT_REQUESTS = 30
-
-try:
-    RATE_LIMIT_WINDOW_SECONDS = max(1.0, float(os.environ.get('RATE_LIMIT_WINDOW_SECONDS', 60)))
-except ValueError:
-    logger.warning("Invalid RATE_LIMIT_WINDOW_SECONDS env; using 60.")
-    RATE_LIMIT_WINDOW_SECONDS = 60.0
+        logger.warning("Invalid %s '%s'; using %s.", name, raw, default)
+        return default
+
+
+MAX_FILE_SIZE = _env('MAX_FILE_SIZE_MB', 16) * 1024 * 1024
+# Plain float seconds: the cleanup gate runs on every request, and floats
+# avoid the timedelta allocations and total_seconds() calls on that path.
+RETENTION_AGE = _env('MAX_FILE_RETENTION_HOURS', 24.0, float) * 3600.0
+CLEANUP_INTERVAL = _env('CLEANUP_INTERVAL_MINUTES', 60.0, float) * 60.0
+RATE_LIMIT_REQUESTS = _env('RATE_LIMIT_REQUESTS', 30)
+RATE_LIMIT_WINDOW_SECONDS = _env('RATE_LIMIT_WINDOW_SECONDS', 60.0, float)
+RATE_LIMIT_MAX_KEYS = _env('RATE_LIMIT_MAX_KEYS', 100_000)
 RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory').lower()
 REDIS_URL = os.environ.get('REDIS_URL')
 KAGGLE_CALL_LIMIT = 20
@@ -120,20 +134,51 @@ app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = str(UPLOAD_FOLDER)
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
+# Derive the credential cipher once; the key derivation would otherwise run
+# on every Kaggle search/preview request.
+_KAGGLE_CIPHER = build_cipher(app.secret_key)
+# Also exposed via config so extensions and tests can reach the shared
+# cipher without importing this module's globals.
+app.config['FERNET'] = _KAGGLE_CIPHER
 app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 app.config['SESSION_COOKIE_SECURE'] = os.environ.get('FLASK_ENV') == 'production'
 
+# Behind a reverse proxy every request appears to come from the proxy IP,
+# collapsing all clients into one rate-limit bucket. Only trust forwarding
+# headers when explicitly enabled, since they are spoofable on direct exposure.
+if os.environ.get('TRUST_PROXY') == '1':
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1)
+    logger.info("ProxyFix enabled; using X-Forwarded-For for client addresses.")
+
 # Create necessary directories on startup
 for directory in [UPLOAD_FOLDER, STATIC_IMAGES_FOLDER, STATIC_REPORTS_FOLDER]:
     directory.mkdir(parents=True, exist_ok=True)
-    logger.info(f"Ensured directory exists: {directory}")
+    logger.info("Ensured directory exists: %s", directory)
 
 UPLOAD_ROOT = UPLOAD_FOLDER.resolve()
 EXAMPLES_ROOT = EXAMPLES_FOLDER.resolve()
 _RATE_LIMIT_STORE: Dict[str, List[float]] = {}
 _RATE_LIMIT_LOCK = threading.Lock()
-_KAGGLE_CACHE: Dict[str, Dict] = {}
+# TTLCache expires entries on monotonic time, so lookups need no manual
+# datetime bookkeeping. TTLCache is not thread-safe, hence the lock.
+_KAGGLE_CACHE = TTLCache(maxsize=256, ttl=KAGGLE_CACHE_TTL.total_seconds())
+_KAGGLE_CACHE_LOCK = threading.Lock()
+
+
+def _build_kaggle_cache_redis():
+    """Shared Redis cache so Kaggle results are reused across workers."""
+    if not REDIS_URL:
+        return None
+    try:
+        import redis  # type: ignore
+    except ImportError:  # pragma: no cover - optional dependency
+        logger.warning("Redis not installed; Kaggle cache stays per-worker.")
+        return None
+    return redis.Redis.from_url(REDIS_URL)
+
+
+_KAGGLE_CACHE_REDIS = _build_kaggle_cache_redis()
 
 
 class RateLimiter(Protocol):
@@ -142,29 +187,85 @@ class RateLimiter(Protocol):
 
 
 class InMemoryRateLimiter:
-    def __init__(self, max_requests: int, window_seconds: float):
+    # Number of independent store/lock shards; must be a power of two so the
+    # shard index can be taken with a cheap bitmask.
+    _SHARDS = 64
+
+    def __init__(self, max_requests: int, window_seconds: float, max_keys: Optional[int] = None,
+                 max_key_len: int = 128):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.store: Dict[str, List[float]] = {}
-        self.lock = threading.Lock()
+        # Longer keys (e.g. attacker-rotated forwarding headers) are folded
+        # to a 16-byte digest so per-key memory stays bounded.
+        self.max_key_len = max_key_len
+        # Token bucket: per-key state is just [tokens, last_refill], so the
+        # allow check is O(1) with no per-second sweep and each key costs a
+        # two-element list instead of a ring of counters.
+        self._refill_per_sec = max_requests / window_seconds
+        # Hard cap on tracked keys so unique-key floods (spoofed addresses,
+        # botnets) cannot grow the store without bound. Spread across shards.
+        self.max_keys_per_shard = max(1, (max_keys or RATE_LIMIT_MAX_KEYS) // self._SHARDS)
+        self._shards: List[tuple[OrderedDict, threading.Lock]] = [
+            (OrderedDict(), threading.Lock()) for _ in range(self._SHARDS)
+        ]
+
+    def _shard(self, key: str) -> tuple[OrderedDict, threading.Lock]:
+        return self._shards[hash(key) & (self._SHARDS - 1)]
 
     def check(self, key: str) -> bool:
+        if len(key) > self.max_key_len:
+            key = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
         now = time.monotonic()
-        window_start = now - self.window_seconds
-        with self.lock:
-            entries = self.store.setdefault(key, [])
-            entries[:] = [ts for ts in entries if ts >= window_start]
-            if len(entries) >= self.max_requests:
+        store, lock = self._shard(key)
+        with lock:
+            state = store.get(key)
+            if state is None:
+                if len(store) >= self.max_keys_per_shard:
+                    store.popitem(last=False)
+                store[key] = [self.max_requests - 1.0, now]
+                return True
+            store.move_to_end(key)
+            tokens = min(self.max_requests,
+                         state[0] + (now - state[1]) * self._refill_per_sec)
+            state[1] = now
+            if tokens < 1.0:
+                state[0] = tokens
                 return False
-            entries.append(now)
+            state[0] = tokens - 1.0
             return True
 
     def reset(self) -> None:
-        with self.lock:
-            self.store.clear()
+        for store, lock in self._shards:
+            with lock:
+                store.clear()
+
+    def reconfigure(self, max_requests: int, window_seconds: float) -> None:
+        """Change the limits in place, discarding all tracked keys.
+
+        Cheaper than constructing a replacement limiter (tests swap limits
+        around every run) and keeps every module-level reference valid.
+        """
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self._refill_per_sec = max_requests / window_seconds
+        self.reset()
 
 
 class RedisRateLimiter:
+    # Sliding-window check executed atomically server-side: prune expired
+    # members, reject if the window is full, otherwise record this request.
+    # ARGV = [now_ms, window_ms, max_requests, member_suffix]; the suffix keeps
+    # members unique when requests land within the same millisecond.
+    _LUA_CHECK = """
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, ARGV[1] - ARGV[2])
+    if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+        return 0
+    end
+    redis.call('ZADD', KEYS[1], ARGV[1], ARGV[1] .. ':' .. ARGV[4])
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return 1
+    """
+
     def __init__(self, url: str, max_requests: int, window_seconds: float):
         try:
             import redis  # type: ignore
@@ -173,23 +274,32 @@ class RedisRateLimiter:
             self._fallback = InMemoryRateLimiter(max_requests, window_seconds)
             return
         self._fallback = None
-        self.client = redis.Redis.from_url(url)
+        # Bounded blocking pool: concurrent checks reuse a fixed set of
+        # connections instead of growing one per thread.
+        pool = redis.BlockingConnectionPool.from_url(url, max_connections=32, timeout=1)
+        self.client = redis.Redis(connection_pool=pool)
         self.max_requests = max_requests
         self.window_seconds = window_seconds
+        self._script = self.client.register_script(self._LUA_CHECK)
+        self._member_local = threading.local()
+
+    def _member_suffix(self) -> str:
+        """Per-thread unique suffix; cheaper than generating randomness per call."""
+        suffix = getattr(self._member_local, 'suffix', None)
+        if suffix is None:
+            suffix = self._member_local.suffix = f"{os.getpid()}:{threading.get_ident()}"
+        return suffix
 
     def check(self, key: str) -> bool:
         if self._fallback:
             return self._fallback.check(key)
-        pipe = self.client.pipeline()
         now_ms = int(time.time() * 1000)
         window_ms = int(self.window_seconds * 1000)
-        key_name = f"rate:{key}"
-        pipe.zremrangebyscore(key_name, 0, now_ms - window_ms)
-        pipe.zcard(key_name)
-        pipe.zadd(key_name, {str(now_ms): now_ms})
-        pipe.expire(key_name, int(self.window_seconds))
-        _, count, _, _ = pipe.execute()
-        return int(count) <= self.max_requests
+        allowed = self._script(
+            keys=[f"rate:{key}"],
+            args=[now_ms, window_ms, self.max_requests, self._member_suffix()],
+        )
+        return bool(allowed)
 
     def reset(self) -> None:
         if self._fallback:
@@ -208,25 +318,69 @@ def _build_rate_limiter() -> RateLimiter:
 
 
 rate_limiter: RateLimiter = _build_rate_limiter()
-kaggle_source = KaggleDataSource()
-
 
-def load_example_metadata() -> list[dict]:
+# Authenticated Kaggle sources keyed by credential hash; re-authenticating on
+# every search/preview costs an external round trip. TTL matches the one-hour
+# credential lifetime in the session.
+_KAGGLE_SOURCES = TTLCache(maxsize=64, ttl=3600)
+_KAGGLE_SOURCES_LOCK = threading.Lock()
+
+
+def _get_authed_source(creds: Dict[str, str]) -> KaggleDataSource:
+    # NUL-delimited so ('ab', 'c') and ('a', 'bc') hash to different keys;
+    # plain concatenation would let such pairs share a cached source.
+    key = hashlib.blake2b(
+        f"{creds.get('username', '')}\x00{creds.get('key', '')}".encode(), digest_size=16
+    ).hexdigest()
+    with _KAGGLE_SOURCES_LOCK:
+        source = _KAGGLE_SOURCES.get(key)
+    if source is not None:
+        return source
+    source = KaggleDataSource()
+    source.authenticate(creds)
+    with _KAGGLE_SOURCES_LOCK:
+        _KAGGLE_SOURCES[key] = source
+    return source
+
+# Shared pool for analysis work so large CSVs don't pin a request thread;
+# fast jobs are awaited briefly so the common case stays a single redirect.
+EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count() or 4)
+JOBS: Dict[str, Dict] = {}
+JOB_WAIT_SECONDS = 5.0
+# Finished jobs whose result was never collected (browser closed before
+# polling /jobs) are evicted after this long so their future, result, and
+# filepath references don't accumulate over a long-lived process.
+JOB_RETENTION_SECONDS = 600.0
+
+
+def _prune_jobs() -> None:
+    """Drop completed jobs that were abandoned past the retention window."""
+    cutoff = time.monotonic() - JOB_RETENTION_SECONDS
+    for job_id, job in list(JOBS.items()):
+        if job['created'] < cutoff and job['future'].done():
+            JOBS.pop(job_id, None)
+
+
+@lru_cache(maxsize=1)
+def load_example_metadata() -> tuple[dict, ...]:
     if not EXAMPLES_METADATA.exists():
         logger.warning("Example metadata not found at %s", EXAMPLES_METADATA)
-        return []
+        return ()
     try:
-        import json
-
-        with open(EXAMPLES_METADATA, 'r') as f:
-            data = json.load(f)
-            return data if isinstance(data, list) else []
+        raw = EXAMPLES_METADATA.read_bytes()
+        data = orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
+        # Metadata is static; freeze it so cached callers share one object.
+        return tuple(data) if isinstance(data, list) else ()
     except Exception as exc:
         logger.warning("Failed to load example metadata: %s", exc)
-        return []
+        return ()
 
 
 EXAMPLE_DATASETS = load_example_metadata()
+# Lazy id->example index; rebuilt only if EXAMPLE_DATASETS is swapped out
+# (tests monkeypatch it), so lookups stay O(1) without a stale cache.
+_examples_index: Dict[str, dict] = {}
+_examples_index_source = None
 
 
 def reset_rate_limits() -> None:
@@ -237,52 +391,107 @@ def reset_rate_limits() -> None:
         logger.warning("Failed to reset rate limits: %s", exc)
 
 
-def cleanup_stale_files(root: Path, older_than: timedelta) -> None:
-    """Remove files older than the provided age inside the given root."""
+def cleanup_stale_files(root: Path, threshold: float) -> int:
+    """Remove files last modified before the given epoch timestamp.
+
+    :return: The number of files removed.
+    """
     if not root.exists():
-        return
+        return 0
+
+    removed = 0
+    # scandir caches stat results from the directory read, avoiding a
+    # separate stat syscall per file.
+    with os.scandir(root) as entries:
+        for entry in entries:
+            try:
+                if entry.is_symlink() or not entry.is_file(follow_symlinks=False):
+                    continue
+                if entry.stat(follow_symlinks=False).st_mtime < threshold:
+                    os.unlink(entry.path)
+                    removed += 1
+                    logger.info("Cleaned up old file: %s", entry.path)
+            except FileNotFoundError:
+                continue
+            except Exception as exc:  # pragma: no cover - defensive logging
+                logger.warning("Failed to clean up %s: %s", entry.path, exc)
+    return removed
 
-    now = datetime.now()
-    for path in root.iterdir():
-        if path.is_symlink() or not path.is_file():
-            continue
-        try:
-            mtime = datetime.fromtimestamp(path.stat().st_mtime)
-            if now - mtime > older_than:
-                path.unlink(missing_ok=True)
-                logger.info("Cleaned up old file: %s", path)
-        except Exception as exc:  # pragma: no cover - defensive logging
-            logger.warning("Failed to clean up %s: %s", path, exc)
+
+_LAST_CLEANUP_MONO = 0.0
+_CLEANUP_LOCK = threading.Lock()
 
 
 def maybe_run_cleanup() -> None:
     """Run periodic cleanup based on configured interval."""
-    last_run = app.config.get('LAST_CLEANUP_AT')
-    now = datetime.now()
-    if last_run and now - last_run < CLEANUP_INTERVAL:
+    global _LAST_CLEANUP_MONO
+    # Double-checked throttle: the unlocked read keeps the hot path to one
+    # float comparison, and the monotonic clock is immune to wall-clock
+    # jumps. The lock ensures only one thread performs the sweep.
+    now = time.monotonic()
+    if now - _LAST_CLEANUP_MONO < CLEANUP_INTERVAL:
         return
+    with _CLEANUP_LOCK:
+        if now - _LAST_CLEANUP_MONO < CLEANUP_INTERVAL:
+            return
+        _LAST_CLEANUP_MONO = now
+        _run_cleanup()
 
+
+def _run_cleanup() -> None:
     cleaned_total = 0
     logger.info(
         "Running cleanup (retention=%s, interval=%s)", RETENTION_AGE, CLEANUP_INTERVAL
     )
-    for folder in [UPLOAD_FOLDER, STATIC_IMAGES_FOLDER, STATIC_REPORTS_FOLDER]:
-        before = sum(1 for _ in folder.glob("*") if _.is_file())
-        cleanup_stale_files(folder, RETENTION_AGE)
-        after = sum(1 for _ in folder.glob("*") if _.is_file())
-        cleaned = max(before - after, 0)
+    # One clock read for the whole sweep.
+    threshold = time.time() - RETENTION_AGE
+    # Read the folder globals here rather than a precomputed tuple; tests
+    # repoint them at temporary directories.
+    for folder in (UPLOAD_FOLDER, STATIC_IMAGES_FOLDER, STATIC_REPORTS_FOLDER):
+        cleaned = cleanup_stale_files(folder, threshold)
         cleaned_total += cleaned
         if cleaned:
             logger.info("Cleanup removed %s files from %s", cleaned, folder)
     logger.info("Cleanup finished; total files removed: %s", cleaned_total)
 
-    app.config['LAST_CLEANUP_AT'] = now
+
+def _cleanup_loop() -> None:
+    """Background loop that purges stale files every CLEANUP_INTERVAL."""
+    while True:
+        time.sleep(max(CLEANUP_INTERVAL, 1.0))
+        try:
+            maybe_run_cleanup()
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.warning("Background cleanup failed: %s", exc)
+
+
+def _is_reloader_parent() -> bool:
+    """True in the werkzeug reloader's supervising process.
+
+    app.debug is only assigned inside __main__, after the module body has
+    run, so this relies on the environment instead: the reloader child
+    always carries WERKZEUG_RUN_MAIN, and a parent without it only exists
+    when debug was requested up front.
+    """
+    debug = (os.environ.get('FLASK_DEBUG') == '1'
+             or os.environ.get('FLASK_ENV') == 'development')
+    return debug and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+
+
+def start_cleanup_thread() -> None:
+    """Start the cleanup daemon thread (skipped in the reloader parent)."""
+    if not _is_reloader_parent():
+        threading.Thread(target=_cleanup_loop, daemon=True, name='cleanup').start()
+
+
+_RATE_LIMITED_ENDPOINTS = frozenset({
+    'upload_file', 'preview_data', 'upload_raw', 'analyze_data', 'analyze_example', 'kaggle', 'kaggle_preview',
+})
 
 
 @app.before_request
 def _before_request():
-    maybe_run_cleanup()
-    if request.method == 'POST' and request.endpoint in {'upload_file', 'preview_data', 'analyze_data', 'analyze_example', 'kaggle', 'kaggle_preview'}:
+    if request.method == 'POST' and request.endpoint in _RATE_LIMITED_ENDPOINTS:
         identifier = request.remote_addr or 'unknown'
         if not rate_limiter.check(identifier):
             flash('Too many requests. Please wait a moment and try again.')
@@ -290,16 +499,19 @@ def _before_request():
             return redirect(url_for('upload_file'))
 
 def allowed_file(filename):
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return os.path.splitext(filename)[1].lower() in ALLOWED_SUFFIXES
 
 
 def get_csrf_token() -> str:
     """Return the current session CSRF token, creating one if needed."""
+    token = getattr(g, 'csrf_token', None)
+    if token:
+        return token
     token = session.get('csrf_token')
     if not token:
         token = secrets.token_urlsafe(32)
         session['csrf_token'] = token
+    g.csrf_token = token
     return token
 
 
@@ -310,28 +522,47 @@ def validate_csrf(form_token: str) -> bool:
     return secrets.compare_digest(expected, form_token)
 
 
+@app.after_request
+def _stamp_artifact_cache_headers(response):
+    # Plot and report filenames are unique per analysis, so clients can
+    # cache them forever instead of re-fetching on every results view.
+    if request.path.startswith(('/static/images/', '/static/reports/')):
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
 @app.errorhandler(413)
 def request_entity_too_large(_):
     flash('File is too large. Please upload a smaller file.')
     return redirect(url_for('upload_file'))
 
 def validate_csv_mime_type(file):
-    """Validate that the uploaded file is actually a CSV by checking content."""
-    # Read first few bytes to check for CSV-like content
+    """Validate that the uploaded file is actually a CSV by sniffing its content."""
+    file.seek(0)
+    sample = file.read(8192)
     file.seek(0)
+    if not sample or b'\x00' in sample:
+        # Binary content; no point running the dialect sniffer.
+        return False
+    text = sample.decode('utf-8', 'replace')
     try:
-        # Try to read as CSV
-        pd.read_csv(file, nrows=1)
-        file.seek(0)
+        csv.Sniffer().sniff(text, delimiters=',;\t|')
         return True
-    except Exception:
-        file.seek(0)
-        return False
+    except csv.Error:
+        # The sniffer cannot determine a delimiter for single-column files,
+        # which are perfectly valid CSVs; accept them as long as the content
+        # is printable text.
+        return all(ch.isprintable() or ch in '\r\n\t' for ch in text)
 
 def generate_unique_filename(base_name, extension):
-    """Generate a unique filename with timestamp."""
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    return f"{base_name}_{timestamp}.{extension}"
+    """Generate a unique filename from a nanosecond clock plus random suffix."""
+    return f"{base_name}_{time.time_ns()}_{secrets.token_hex(3)}.{extension}"
+
+
+@lru_cache(maxsize=1024)
+def _sanitize_filename(name: str) -> str:
+    """Memoized secure_filename; analyze re-submits names we generated."""
+    return secure_filename(name)
 
 
 def build_upload_path(filename: str):
@@ -341,13 +572,34 @@ def build_upload_path(filename: str):
     :returns: tuple of (safe filename, resolved Path)
     :raises ValueError: if the resolved path escapes the uploads root.
     """
-    safe_name = secure_filename(filename)
-    candidate = (UPLOAD_ROOT / safe_name).resolve()
-
-    if UPLOAD_ROOT not in candidate.parents and candidate != UPLOAD_ROOT:
+    safe_name = _sanitize_filename(filename)
+    # secure_filename already strips separators and '..', so a lexical
+    # normpath + prefix check suffices; Path.resolve would stat every
+    # component just to chase symlinks we never create.
+    root = str(UPLOAD_ROOT)
+    candidate = os.path.normpath(os.path.join(root, safe_name))
+
+    if not candidate.startswith(root + os.sep) or candidate == root:
         raise ValueError("Invalid upload path")
 
-    return safe_name, candidate
+    return safe_name, Path(candidate)
+
+
+def remember_pending_upload(filepath: Path) -> None:
+    """Record the just-saved upload in the session for the analyze step."""
+    session['pending_upload'] = {'name': filepath.name, 'path': str(filepath)}
+
+
+def resolve_pending_upload(filename: str) -> Optional[Path]:
+    """Return the session-recorded path for a filename we generated ourselves.
+
+    Avoids re-sanitizing and re-resolving (symlink-walking stat calls) a name
+    that never left our control. Returns None when the session has no match.
+    """
+    pending = session.get('pending_upload')
+    if pending and pending.get('name') == filename:
+        return Path(pending['path'])
+    return None
 
 
 def _get_kaggle_store():
@@ -357,7 +609,7 @@ def _get_kaggle_store():
 
 def set_kaggle_credentials(username: str, key: str):
     creds = {"username": username, "key": key}
-    token = encrypt_credentials(app.secret_key, creds)
+    token = encrypt_with(_KAGGLE_CIPHER, creds)
     _get_kaggle_store()['token'] = token
     _get_kaggle_store()['expires_at'] = (datetime.utcnow() + timedelta(hours=1)).isoformat()
 
@@ -374,28 +626,35 @@ def get_kaggle_credentials() -> Optional[Dict[str, str]]:
     except Exception:
         return None
     try:
-        return decrypt_credentials(app.secret_key, token)
+        return decrypt_with(_KAGGLE_CIPHER, token)
     except ExternalDataAuthError:
         return None
 
 
+def _prune_kaggle_calls(store) -> list:
+    """Drop call records older than the rolling window.
+
+    Calls are stored as epoch floats: comparisons are plain float math (no
+    fromisoformat parse per entry) and the session cookie stays small.
+    """
+    cutoff = time.time() - KAGGLE_CALL_WINDOW.total_seconds()
+    # Sessions minted before the epoch-float change stored ISO strings;
+    # drop anything non-numeric instead of raising TypeError on compare.
+    calls = [ts for ts in store.get('calls', [])
+             if isinstance(ts, (int, float)) and ts > cutoff]
+    store['calls'] = calls
+    return calls
+
+
 def record_kaggle_call() -> None:
     store = _get_kaggle_store()
-    calls = store.get('calls', [])
-    now = datetime.utcnow()
-    cutoff = now - KAGGLE_CALL_WINDOW
-    calls = [ts for ts in calls if datetime.fromisoformat(ts) > cutoff]
-    calls.append(now.isoformat())
+    calls = _prune_kaggle_calls(store)
+    calls.append(time.time())
     store['calls'] = calls
 
 
 def remaining_kaggle_calls() -> int:
-    store = _get_kaggle_store()
-    calls = store.get('calls', [])
-    now = datetime.utcnow()
-    cutoff = now - KAGGLE_CALL_WINDOW
-    calls = [ts for ts in calls if datetime.fromisoformat(ts) > cutoff]
-    store['calls'] = calls
+    calls = _prune_kaggle_calls(_get_kaggle_store())
     return max(KAGGLE_CALL_LIMIT - len(calls), 0)
 
 
@@ -405,28 +664,43 @@ def ensure_kaggle_capacity():
 
 
 def kaggle_cache_get(key: str):
-    entry = _KAGGLE_CACHE.get(key)
-    if not entry:
-        return None
-    if datetime.utcnow() > entry['expires_at']:
-        _KAGGLE_CACHE.pop(key, None)
-        return None
-    return entry['value']
+    if _KAGGLE_CACHE_REDIS is not None:
+        try:
+            raw = _KAGGLE_CACHE_REDIS.get(f"kaggle-cache:{key}")
+            if raw is None:
+                return None
+            return orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.warning("Kaggle cache read failed: %s", exc)
+            return None
+    with _KAGGLE_CACHE_LOCK:
+        return _KAGGLE_CACHE.get(key)
 
 
 def kaggle_cache_set(key: str, value):
-    _KAGGLE_CACHE[key] = {"value": value, "expires_at": datetime.utcnow() + KAGGLE_CACHE_TTL}
+    if _KAGGLE_CACHE_REDIS is not None:
+        try:
+            payload = orjson.dumps(value) if HAS_ORJSON else json.dumps(value)
+            _KAGGLE_CACHE_REDIS.setex(
+                f"kaggle-cache:{key}", int(KAGGLE_CACHE_TTL.total_seconds()), payload
+            )
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.warning("Kaggle cache write failed: %s", exc)
+        return
+    with _KAGGLE_CACHE_LOCK:
+        _KAGGLE_CACHE[key] = value
 
 
 def get_example(example_id: str) -> Optional[dict]:
-    for item in EXAMPLE_DATASETS:
-        if item.get("id") == example_id:
-            return item
-    return None
+    global _examples_index, _examples_index_source
+    if EXAMPLE_DATASETS is not _examples_index_source:
+        _examples_index = {item['id']: item for item in EXAMPLE_DATASETS if 'id' in item}
+        _examples_index_source = EXAMPLE_DATASETS
+    return _examples_index.get(example_id)
 
 
 def build_example_path(filename: str) -> Path:
-    safe_name = secure_filename(filename)
+    safe_name = _sanitize_filename(filename)
     candidate = (EXAMPLES_ROOT / safe_name).resolve()
     if EXAMPLES_ROOT not in candidate.parents and candidate != EXAMPLES_ROOT:
         raise ValueError("Invalid example path")
@@ -467,75 +741,177 @@ def upload_file():
 
         if not file or not allowed_file(file.filename):
             flash('Invalid file type. Please upload a CSV file.')
-            logger.warning(f"Upload attempt with invalid file type: {file.filename}")
+            logger.warning("Upload attempt with invalid file type: %s", file.filename)
             return redirect(request.url)
 
         # Validate MIME type
         if not validate_csv_mime_type(file):
             flash('File does not appear to be a valid CSV file.')
-            logger.warning(f"Upload attempt with invalid CSV content: {file.filename}")
+            logger.warning("Upload attempt with invalid CSV content: %s", file.filename)
             return redirect(request.url)
 
         # Save uploaded file with unique name
         original_filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = time.time_ns()
         filename = f"{timestamp}_{original_filename}"
         _, filepath = build_upload_path(filename)
-        file.save(filepath)
-        logger.info(f"File uploaded successfully: {filename}")
+        # Copy with a 1MiB buffer; FileStorage.save defaults to 16KiB chunks,
+        # which costs ~64x the syscalls for a maximum-size upload.
+        file.stream.seek(0)
+        with open(filepath, 'wb') as dst:
+            shutil.copyfileobj(file.stream, dst, length=1024 * 1024)
+        logger.info("File uploaded successfully: %s", filename)
 
         column = request.form.get('column', '').strip()
         if not column:
             flash('Column name is required')
             return redirect(request.url)
 
-        # Generate unique output filenames
-        plot_filename = generate_unique_filename('benford_plot', 'png')
-        report_filename = generate_unique_filename('benford_report', 'txt')
-        plot_path = STATIC_IMAGES_FOLDER / plot_filename
-        report_path = STATIC_REPORTS_FOLDER / report_filename
+        return _submit_analysis(filepath, column, dataset_label=original_filename)
 
-        analyzer = BenfordAnalyzer(str(filepath), column, str(plot_path), str(report_path))
+    return render_template('upload.html', csrf_token=get_csrf_token())
+
+def _read_preview_sample(source) -> pd.DataFrame:
+    """Parse a bounded CSV sample for the preview page.
+
+    With pyarrow installed, the first 1MiB block goes through Arrow's
+    multi-threaded C++ reader; otherwise — or when Arrow rejects input
+    that pandas can still salvage, such as ragged rows — the C engine
+    parses a 1000-row sample with bad lines skipped.
+    """
+    if HAS_PYARROW:  # pragma: no cover - optional dependency
         try:
-            results = analyzer.run()
-            p_value, t_stat = extract_stats(results)
-            logger.info(f"Analysis completed successfully for column: {column}")
-            # Store filenames in session or pass via URL params
-            return redirect(url_for('show_results',
-                                    plot=plot_filename,
-                                    report=report_filename,
-                                    p=p_value,
-                                    t=t_stat,
-                                    dataset=original_filename))
-        except FileNotFoundError as e:
-            flash(f'File error: {str(e)}')
-            logger.error(f"File not found during analysis: {str(e)}")
-            return redirect(request.url)
-        except ValueError as e:
-            # Provide helpful error message with available columns
-            try:
-                df = pd.read_csv(filepath)
-                numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-                all_cols = df.columns.tolist()
-
-                if numeric_cols:
-                    flash(f"Column '{column}' not found or not numeric. Available numeric columns: {', '.join(numeric_cols)}")
-                else:
-                    flash(f"No numeric columns found in the CSV. Available columns: {', '.join(all_cols)}")
-                logger.warning(f"Invalid column requested: {column}")
-            except Exception:
-                flash(f'Error: {str(e)}')
-            return redirect(request.url)
+            opts = pacsv.ReadOptions(block_size=1 << 20, use_threads=True)
+            with pacsv.open_csv(os.fspath(source) if isinstance(source, Path) else source,
+                                read_options=opts) as reader:
+                return reader.read_next_batch().to_pandas()
+        except (pa.ArrowInvalid, StopIteration):
+            if hasattr(source, 'seek'):
+                source.seek(0)
+    return pd.read_csv(source, nrows=1000, on_bad_lines='skip')
+
+
+def _render_preview_from_disk(filepath: Path):
+    """Build the preview response for a CSV already saved under uploads."""
+    # A 1000-row sample gives stable dtype inference for the column picker
+    # without parsing the whole file; only ten rows are actually displayed.
+    # Ragged rows are skipped rather than failing the whole preview.
+    sample = _read_preview_sample(filepath)
+    df_head = sample.head(10)
+    numeric_cols = sample.select_dtypes(include=['number']).columns.tolist()
+    all_cols = sample.columns.tolist()
+    preview_html = df_head.to_html(classes='preview-table', index=False)
+
+    remember_pending_upload(filepath)
+    return render_template('preview.html',
+                         preview_html=preview_html,
+                         numeric_cols=numeric_cols,
+                         all_cols=all_cols,
+                         filename=filepath.name,
+                         row_count=count_data_rows(filepath),
+                         csrf_token=get_csrf_token())
+
+
+def _preview_streaming():
+    """Stream the multipart body straight to disk, bypassing werkzeug's
+    buffered form parser, then validate and render from the saved file."""
+    tmp_name = f"incoming_{time.time_ns()}_{secrets.token_hex(3)}.csv"
+    _, tmp_path = build_upload_path(tmp_name)
+    file_target = FileTarget(str(tmp_path))
+    csrf_target = ValueTarget()
+    parser = StreamingFormDataParser(headers=request.headers)
+    parser.register('file', file_target)
+    parser.register('csrf_token', csrf_target)
+
+    try:
+        received = 0
+        while chunk := request.stream.read(65536):
+            received += len(chunk)
+            if received > MAX_FILE_SIZE:
+                # Werkzeug's MAX_CONTENT_LENGTH check only sees a declared
+                # Content-Length; enforce the cap on the actual bytes so
+                # chunked bodies hit the same 413 flash path.
+                raise RequestEntityTooLarge()
+            parser.data_received(chunk)
+
+        if not validate_csrf(csrf_target.value.decode('utf-8', 'replace')):
+            flash('Invalid or missing CSRF token. Please try again.')
+            logger.warning("CSRF validation failed on preview.")
+            return redirect(url_for('upload_file'))
+
+        original_filename = file_target.multipart_filename or ''
+        if not original_filename:
+            flash('No selected file')
+            return redirect(url_for('upload_file'))
+        if not allowed_file(original_filename):
+            flash('Invalid file type. Please upload a CSV file.')
+            return redirect(url_for('upload_file'))
+
+        timestamp = time.time_ns()
+        filename = f"{timestamp}_{secure_filename(original_filename)}"
+        _, filepath = build_upload_path(filename)
+        os.replace(tmp_path, filepath)
+        try:
+            return _render_preview_from_disk(filepath)
         except Exception as e:
-            flash(f'An unexpected error occurred: {str(e)}')
-            logger.error(f"Unexpected error during analysis: {str(e)}", exc_info=True)
-            return redirect(request.url)
+            # The file has already been promoted out of tmp_path; drop it so
+            # a failed preview doesn't leave the bad upload behind, matching
+            # the buffered path which saves nothing on parse failure.
+            filepath.unlink(missing_ok=True)
+            flash(f'Error reading CSV file: {str(e)}')
+            logger.error("Error previewing CSV: %s", e, exc_info=True)
+            return redirect(url_for('upload_file'))
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+@app.route('/upload/raw', methods=['POST'])
+def upload_raw():
+    """Accept a raw text/csv body, skipping multipart parsing entirely.
+
+    Front-end callers POST the file bytes directly with the filename in an
+    X-Filename header and the CSRF token in X-CSRF-Token.
+    """
+    if not validate_csrf(request.headers.get('X-CSRF-Token', '')):
+        flash('Invalid or missing CSRF token. Please try again.')
+        logger.warning("CSRF validation failed on raw upload.")
+        return redirect(url_for('upload_file'))
+
+    content_type = (request.content_type or '').split(';')[0].strip().lower()
+    if content_type not in {'text/csv', 'application/csv'}:
+        flash('Raw uploads must be sent as text/csv.')
+        return redirect(url_for('upload_file'))
+
+    client_name = request.headers.get('X-Filename', '').strip()
+    if not client_name or not allowed_file(client_name):
+        flash('Invalid file type. Please upload a CSV file.')
+        return redirect(url_for('upload_file'))
+
+    timestamp = time.time_ns()
+    try:
+        _, filepath = build_upload_path(f"{timestamp}_{secure_filename(client_name)}")
+    except ValueError:
+        flash('Invalid filename provided.')
+        return redirect(url_for('upload_file'))
+
+    with open(filepath, 'wb') as dst:
+        shutil.copyfileobj(request.stream, dst, length=1024 * 1024)
+
+    try:
+        return _render_preview_from_disk(filepath)
+    except Exception as e:
+        filepath.unlink(missing_ok=True)
+        flash(f'Error reading CSV file: {str(e)}')
+        logger.error("Error previewing raw upload: %s", e, exc_info=True)
+        return redirect(url_for('upload_file'))
 
-    return render_template('upload.html', csrf_token=get_csrf_token())
 
 @app.route('/preview', methods=['POST'])
 def preview_data():
     """Preview uploaded CSV and show available columns."""
+    if HAS_STREAMING_FORM_DATA and (request.content_type or '').startswith('multipart/form-data'):
+        return _preview_streaming()
+
     if not validate_csrf(request.form.get('csrf_token')):
         flash('Invalid or missing CSRF token. Please try again.')
         logger.warning("CSRF validation failed on preview.")
@@ -555,34 +931,42 @@ def preview_data():
         return redirect(url_for('upload_file'))
 
     try:
-        # Read CSV for preview
-        df = pd.read_csv(file)
-        file.seek(0)
-
-        # Get column information
-        numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-        all_cols = df.columns.tolist()
-
-        # Get preview data (first 10 rows)
-        preview_html = df.head(10).to_html(classes='preview-table', index=False)
+        # Read the upload once; reuse the same bytes for the disk copy and
+        # the preview parse instead of re-reading the spooled temp file.
+        raw = file.stream.read()
+
+        # Only the first rows are shown; a 1000-row sample is enough for
+        # dtype inference without parsing the full file.
+        sample = _read_preview_sample(io.BytesIO(raw))
+        df_head = sample.head(10)
+        numeric_cols = sample.select_dtypes(include=['number']).columns.tolist()
+        all_cols = sample.columns.tolist()
+        preview_html = df_head.to_html(classes='preview-table', index=False)
+
+        # Row count from a newline scan rather than a full pandas parse.
+        row_count = raw.count(b'\n')
+        if raw and not raw.endswith(b'\n'):
+            row_count += 1
+        row_count = max(row_count - 1, 0)
 
         # Save file temporarily for later analysis
         original_filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = time.time_ns()
         filename = f"{timestamp}_{original_filename}"
         _, filepath = build_upload_path(filename)
-        file.save(filepath)
+        filepath.write_bytes(raw)
+        remember_pending_upload(filepath)
 
         return render_template('preview.html',
                              preview_html=preview_html,
                              numeric_cols=numeric_cols,
                              all_cols=all_cols,
                              filename=os.path.basename(filepath),
-                             row_count=len(df),
+                             row_count=row_count,
                              csrf_token=get_csrf_token())
     except Exception as e:
         flash(f'Error reading CSV file: {str(e)}')
-        logger.error(f"Error previewing CSV: {str(e)}", exc_info=True)
+        logger.error("Error previewing CSV: %s", e, exc_info=True)
         return redirect(url_for('upload_file'))
 
 
@@ -605,7 +989,8 @@ def download_example(example_id):
         return redirect(url_for('examples'))
     try:
         path = build_example_path(example['filename'])
-        return send_file(path, as_attachment=True, download_name=example['filename'])
+        return send_from_directory(path.parent, path.name, as_attachment=True,
+                                   download_name=example['filename'], max_age=86400)
     except Exception as exc:
         flash(f'Could not download example: {exc}')
         return redirect(url_for('examples'))
@@ -629,30 +1014,12 @@ def analyze_example(example_id):
         flash(f'Could not load example: {exc}')
         return redirect(url_for('examples'))
 
-    column = example.get('column')
-    dataset_label = example.get('name', example_id)
-    expectation = example.get('expectation')
-
-    plot_filename = generate_unique_filename(f"{example_id}_plot", 'png')
-    report_filename = generate_unique_filename(f"{example_id}_report", 'txt')
-    plot_path = STATIC_IMAGES_FOLDER / plot_filename
-    report_path = STATIC_REPORTS_FOLDER / report_filename
-
-    analyzer = BenfordAnalyzer(str(filepath), column, str(plot_path), str(report_path))
-    try:
-        results = analyzer.run()
-        p_value, t_stat = extract_stats(results)
-        return redirect(url_for('show_results',
-                                plot=plot_filename,
-                                report=report_filename,
-                                p=p_value,
-                                t=t_stat,
-                                dataset=dataset_label,
-                                expectation=expectation))
-    except Exception as exc:
-        flash(f'Error analyzing example: {exc}')
-        logger.error("Example analysis failed: %s", exc, exc_info=True)
-        return redirect(url_for('examples'))
+    return _submit_analysis(filepath,
+                            example.get('column'),
+                            dataset_label=example.get('name', example_id),
+                            expectation=example.get('expectation'),
+                            error_endpoint='examples',
+                            output_base=example_id)
 
 
 @app.route('/kaggle', methods=['GET', 'POST'])
@@ -688,8 +1055,8 @@ def kaggle():
             if cached:
                 search_results = cached
             else:
-                kaggle_source.authenticate(creds)
-                search_results = kaggle_source.search(query or "")
+                source = _get_authed_source(creds)
+                search_results = source.search(query or "")
                 kaggle_cache_set(cache_key, search_results)
             record_kaggle_call()
             remaining = remaining_kaggle_calls()
@@ -732,8 +1099,8 @@ def kaggle_preview():
 
     try:
         ensure_kaggle_capacity()
-        kaggle_source.authenticate(creds)
-        meta = kaggle_source.get_metadata(dataset_ref)
+        source = _get_authed_source(creds)
+        meta = source.get_metadata(dataset_ref)
         file_entry = next((f for f in meta.get('csv_files', []) if f['name'] == file_name), None)
         if not file_entry:
             flash('CSV file not found in dataset.')
@@ -742,18 +1109,22 @@ def kaggle_preview():
             flash('CSV file exceeds the 50MB download limit.')
             return redirect(url_for('kaggle'))
 
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = time.time_ns()
         unique_name = f"{timestamp}_{secure_filename(file_name)}"
         _, dest_path = build_upload_path(unique_name)
-        downloaded_path = kaggle_source.download(dataset_ref, file_name, dest_path)
+        downloaded_path = source.download(dataset_ref, file_name, dest_path)
 
-        preview_html, numeric_cols, all_cols, row_count = read_preview(downloaded_path, max_rows=100)
-        if row_count > 500_000:
-            flash('Dataset too large (over 500k rows) for inline preview.')
+        # Gate on file size before parsing anything; a byte count is a good
+        # proxy for the old 500k-row limit and avoids scanning the whole file.
+        if downloaded_path.stat().st_size > 20 * 1024 * 1024:
+            flash('Dataset too large for inline preview.')
             downloaded_path.unlink(missing_ok=True)
             return redirect(url_for('kaggle'))
 
+        preview_html, numeric_cols, all_cols, row_count = read_preview(downloaded_path, max_rows=100)
+
         record_kaggle_call()
+        remember_pending_upload(Path(downloaded_path))
         return render_template(
             'preview.html',
             preview_html=preview_html,
@@ -789,42 +1160,142 @@ def analyze_data():
         flash('Missing filename or column')
         return redirect(url_for('upload_file'))
 
-    try:
-        _, filepath = build_upload_path(filename)
-    except ValueError:
-        flash('Invalid filename provided.')
-        logger.warning("Attempted analysis with invalid filename: %s", filename)
-        return redirect(url_for('upload_file'))
+    filepath = resolve_pending_upload(filename)
+    if filepath is None:
+        try:
+            _, filepath = build_upload_path(filename)
+        except ValueError:
+            flash('Invalid filename provided.')
+            logger.warning("Attempted analysis with invalid filename: %s", filename)
+            return redirect(url_for('upload_file'))
 
     if not filepath.exists():
         flash('Uploaded file not found. Please upload again.')
         return redirect(url_for('upload_file'))
 
-    # Generate unique output filenames
-    plot_filename = generate_unique_filename('benford_plot', 'png')
-    report_filename = generate_unique_filename('benford_report', 'txt')
+    return _submit_analysis(filepath, column, dataset_label=filename)
+
+
+def _flash_column_error(filepath, column: str, exc: Exception) -> None:
+    """Flash a helpful bad-column message, sampling rather than re-parsing."""
+    try:
+        all_cols = pd.read_csv(filepath, nrows=0).columns.tolist()
+        sample = pd.read_csv(filepath, nrows=1000)
+        numeric_cols = sample.select_dtypes(include=['number']).columns.tolist()
+
+        if numeric_cols:
+            flash(f"Column '{column}' not found or not numeric. Available numeric columns: {', '.join(numeric_cols)}")
+        else:
+            flash(f"No numeric columns found in the CSV. Available columns: {', '.join(all_cols)}")
+        logger.warning("Invalid column requested: %s", column)
+    except Exception:
+        flash(f'Error: {str(exc)}')
+
+
+def _submit_analysis(filepath, column: str, dataset_label: str,
+                     expectation: Optional[str] = None,
+                     error_endpoint: str = 'upload_file',
+                     output_base: str = 'benford'):
+    """Run an analysis on the shared pool and redirect to results.
+
+    Shared by the upload, analyze, and example routes; fast jobs finish
+    within JOB_WAIT_SECONDS and redirect straight to results, slower ones
+    hand off to the /jobs endpoint.
+    """
+    plot_filename = generate_unique_filename(f'{output_base}_plot', 'png')
+    report_filename = generate_unique_filename(f'{output_base}_report', 'txt')
     plot_path = STATIC_IMAGES_FOLDER / plot_filename
     report_path = STATIC_REPORTS_FOLDER / report_filename
 
     analyzer = BenfordAnalyzer(str(filepath), column, str(plot_path), str(report_path))
+    _prune_jobs()
+    job_id = secrets.token_urlsafe(8)
+    JOBS[job_id] = {
+        'future': EXECUTOR.submit(analyzer.run),
+        'created': time.monotonic(),
+        'plot': plot_filename,
+        'report': report_filename,
+        'dataset': dataset_label,
+        'column': column,
+        'filepath': filepath,
+        'expectation': expectation,
+        'error_endpoint': error_endpoint,
+    }
     try:
-        results = analyzer.run()
+        JOBS[job_id]['future'].result(timeout=JOB_WAIT_SECONDS)
+    except FuturesTimeoutError:
+        logger.info("Analysis still running; handing off to job %s", job_id)
+        return redirect(url_for('job_status', job_id=job_id))
+    except Exception:
+        pass  # Completed with an error; let the shared handler flash it.
+    return _finish_job(job_id)
+
+
+def _compress_plot(plot_filename: str) -> None:
+    """Quantize a finished plot to an 8-bit palette PNG.
+
+    Matplotlib writes 24-bit RGB, but the charts use only a handful of
+    colors; an adaptive 64-color palette cuts the bytes on the wire
+    3-5x with no visible difference.
+    """
+    if not HAS_PIL:
+        return
+    path = STATIC_IMAGES_FOLDER / plot_filename
+    try:
+        with Image.open(path) as img:
+            quantized = img.convert('RGB').convert('P', palette=Image.ADAPTIVE, colors=64)
+        quantized.save(path, optimize=True)
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.warning("Plot compression failed for %s: %s", plot_filename, exc)
+
+
+def _finish_job(job_id: str):
+    """Turn a completed analysis job into the appropriate redirect."""
+    # Default on the pop: two concurrent polls of the same job (e.g. two
+    # tabs) race here, and the loser must get the not-found flash, not a 500.
+    job = JOBS.pop(job_id, None)
+    if job is None:
+        flash('Analysis job not found. Please try again.')
+        return redirect(url_for('upload_file'))
+    column = job['column']
+    error_endpoint = job['error_endpoint']
+    try:
+        results = job['future'].result()
         p_value, t_stat = extract_stats(results)
-        logger.info(f"Analysis completed successfully for column: {column}")
+        _compress_plot(job['plot'])
+        logger.info("Analysis completed successfully for column: %s", column)
         return redirect(url_for('show_results',
-                                plot=plot_filename,
-                                report=report_filename,
+                                plot=job['plot'],
+                                report=job['report'],
                                 p=p_value,
                                 t=t_stat,
-                                dataset=filename))
-    except ValueError as e:
-        flash(f'Error: {str(e)}')
-        logger.warning(f"Invalid column during analysis: {column}")
-        return redirect(url_for('upload_file'))
+                                dataset=job['dataset'],
+                                expectation=job['expectation']))
     except Exception as e:
-        flash(f'An unexpected error occurred: {str(e)}')
-        logger.error(f"Unexpected error during analysis: {str(e)}", exc_info=True)
+        if error_endpoint == 'examples':
+            flash(f'Error analyzing example: {e}')
+            logger.error("Example analysis failed: %s", e, exc_info=True)
+        elif isinstance(e, FileNotFoundError):
+            flash(f'File error: {str(e)}')
+            logger.error("File not found during analysis: %s", e)
+        elif isinstance(e, ValueError):
+            _flash_column_error(job['filepath'], column, e)
+        else:
+            flash(f'An unexpected error occurred: {str(e)}')
+            logger.error("Unexpected error during analysis: %s", e, exc_info=True)
+        return redirect(url_for(error_endpoint))
+
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Poll a long-running analysis; 202 until done, then redirect to results."""
+    job = JOBS.get(job_id)
+    if job is None:
+        flash('Analysis job not found. Please try again.')
         return redirect(url_for('upload_file'))
+    if not job['future'].done():
+        return 'Analysis in progress. Refresh to check again.', 202, {'Retry-After': '2'}
+    return _finish_job(job_id)
 
 @app.route('/results')
 def show_results():
@@ -857,7 +1328,34 @@ def show_results():
         expectation=expectation
     )
 
+def _warm_heavy_imports() -> None:
+    """Pay matplotlib's font-cache scan and pandas' parser setup at boot.
+
+    Without this the first analysis after startup eats both costs, adding
+    seconds to that request's latency.
+    """
+    try:
+        import matplotlib.pyplot as plt
+
+        plt.figure()
+        plt.close('all')
+        pd.read_csv(io.StringIO('a\n1\n'))
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.warning("Warm-up failed: %s", exc)
+
+
+if not _is_reloader_parent():
+    # Warm up off the main thread so import doesn't block the first request
+    # from being accepted while matplotlib scans its font cache.
+    threading.Thread(target=_warm_heavy_imports, daemon=True).start()
+    # Start cleanup here rather than under __main__: WSGI deployments
+    # (PythonAnywhere) import the module and never run __main__, and stale
+    # uploads would otherwise accumulate unbounded.
+    start_cleanup_thread()
+
+
 if __name__ == '__main__':
     # Only use debug mode if not in production
     debug_mode = os.environ.get('FLASK_ENV') != 'production'
+    app.debug = debug_mode
     app.run(debug=debug_mode)
@@ -1,5 +1,23 @@
 from typing import Optional, Dict
 
+# Message fragments precomputed by (conforms, condition) so each request
+# does two dict lookups instead of re-walking the branch chain.
+_OUTCOMES = {
+    True: "likely follows Benford's Law",
+    False: "likely does not follow Benford's Law",
+}
+_GUIDANCE = {
+    True: "No red flags detected. The first-digit distribution is close to the Benford curve.",
+    False: "Significant deviation detected. Investigate the data generation process or potential anomalies.",
+}
+_ALIGNMENT = {
+    ("conform", True): "This matches the expected behavior for this dataset.",
+    ("conform", False): "This result differs from the typical expectation—worth a closer look.",
+    ("nonconform", True): "This result differs from the typical expectation—worth a closer look.",
+    ("nonconform", False): "This deviation is expected for this dataset.",
+}
+_UNEXPECTED_ALIGNMENT = "This result differs from the typical expectation—worth a closer look."
+
 
 def interpret_results(
     p_value: Optional[float],
@@ -10,8 +28,8 @@ def interpret_results(
     """
     Produce a plain-language interpretation of Benford test results.
 
-    :param p_value: P-value from benfordslaw
-    :param chi_squared: Chi-squared statistic from benfordslaw
+    :param p_value: P-value from the chi-squared test
+    :param chi_squared: Chi-squared statistic from the test
     :param dataset_name: Optional dataset label to personalize messaging
     :param expectation: Optional expectation hint ('conform' or 'nonconform')
     """
@@ -23,25 +41,11 @@ def interpret_results(
             "guidance": "Re-run the analysis or verify the dataset contains numeric data."
         }
 
-    outcome = "likely follows Benford's Law" if p_value > 0.05 else "likely does not follow Benford's Law"
-
-    alignment = ""
-    if expectation:
-        if expectation == "conform" and p_value > 0.05:
-            alignment = "This matches the expected behavior for this dataset."
-        elif expectation == "nonconform" and p_value <= 0.05:
-            alignment = "This deviation is expected for this dataset."
-        else:
-            alignment = "This result differs from the typical expectation—worth a closer look."
-
-    guidance = (
-        "No red flags detected. The first-digit distribution is close to the Benford curve."
-        if p_value > 0.05 else
-        "Significant deviation detected. Investigate the data generation process or potential anomalies."
-    )
+    conforms = p_value > 0.05
+    alignment = _ALIGNMENT.get((expectation, conforms), _UNEXPECTED_ALIGNMENT) if expectation else ""
 
     return {
-        "headline": f"{name} {outcome}",
+        "headline": f"{name} {_OUTCOMES[conforms]}",
         "detail": f"p-value: {p_value:.4f}, chi-squared: {chi_squared:.4f}. {alignment}".strip(),
-        "guidance": guidance
+        "guidance": _GUIDANCE[conforms]
     }
@@ -12,7 +12,7 @@ def main():
     parser = argparse.ArgumentParser(description="Run Benford's Law analysis on a CSV file.")
     parser.add_argument('--csv', required=True, help='Path to CSV file')
     parser.add_argument('--column', required=True, help='Numeric column name to analyze')
-    parser.add_argument('--plot', default='output/benford_plot.png', help='Output plot path')
+    parser.add_argument('--plot', default='output/benford_plot.png', help='Output plot path (pass an empty string to skip plotting)')
     parser.add_argument('--report', default='output/benford_test_report.txt', help='Output report path')
     args = parser.parse_args()
 
@@ -20,7 +20,8 @@ def main():
         csv_path=args.csv,
         column=args.column,
         plot_path=args.plot,
-        report_path=args.report
+        report_path=args.report,
+        generate_plot=bool(args.plot)
     )
 
     try:
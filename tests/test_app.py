@@ -1,7 +1,9 @@
+import fnmatch
 import io
 import os
+import shutil
+import threading
 import time
-from datetime import datetime, timedelta
 
 import pytest
 
@@ -9,86 +11,125 @@ import app as flask_app
 from benford import external_data
 from benford.analyzer import BenfordAnalyzer
 
+# Shared upload payloads; tests wrap them in BytesIO at the point of use.
+CSV_TWO_COLS = b"value,name\n1,A\n2,B\n"
+CSV_ONE_COL = b"value\n1\n2\n3\n"
+CSV_BAD = b"\xff\xff\x00\x00notcsv"
 
-@pytest.fixture(autouse=True)
-def reset_rate_limits():
-    flask_app.reset_rate_limits()
-    yield
-    flask_app.reset_rate_limits()
 
+@pytest.fixture(scope="session")
+def temp_dirs(tmp_path_factory):
+    base = tmp_path_factory.mktemp("appdata")
+    dirs = {
+        "upload": base / "uploads",
+        "images": base / "static" / "images",
+        "reports": base / "static" / "reports",
+    }
+    # One parents=True walk creates base/static; the other two are plain
+    # leaf mkdirs, skipping redundant ancestor traversals.
+    dirs["images"].mkdir(parents=True)
+    dirs["reports"].mkdir()
+    dirs["upload"].mkdir()
+    return dirs
+
+
+@pytest.fixture(scope="session")
+def temp_app(temp_dirs):
+    # Configure the app once for the whole session; per-test isolation is
+    # handled by reset_state, which only clears mutable state.
+    mp = pytest.MonkeyPatch()
+    mp.setattr(flask_app, "UPLOAD_FOLDER", temp_dirs["upload"])
+    mp.setattr(flask_app, "STATIC_IMAGES_FOLDER", temp_dirs["images"])
+    mp.setattr(flask_app, "STATIC_REPORTS_FOLDER", temp_dirs["reports"])
+    mp.setattr(flask_app, "UPLOAD_ROOT", temp_dirs["upload"].resolve())
+    mp.setattr(flask_app, "RETENTION_AGE", 0.1)
+    mp.setattr(flask_app, "CLEANUP_INTERVAL", 0.0)
+    mp.setattr(flask_app, "RATE_LIMIT_REQUESTS", 30)
+    mp.setattr(flask_app, "RATE_LIMIT_WINDOW_SECONDS", 60.0)
+
+    flask_app.app.config["UPLOAD_FOLDER"] = str(temp_dirs["upload"])
+    # Templates never change mid-run; skipping the auto-reload stat avoids a
+    # filesystem check on every render (each redirect-with-flash included).
+    flask_app.app.config["TEMPLATES_AUTO_RELOAD"] = False
+    flask_app.app.jinja_env.auto_reload = False
+
+    yield flask_app.app
+    mp.undo()
 
-@pytest.fixture
-def temp_app(monkeypatch, tmp_path):
-    upload = tmp_path / "uploads"
-    images = tmp_path / "static" / "images"
-    reports = tmp_path / "static" / "reports"
-    for path in [upload, images, reports]:
-        path.mkdir(parents=True, exist_ok=True)
 
-    monkeypatch.setattr(flask_app, "UPLOAD_FOLDER", upload)
-    monkeypatch.setattr(flask_app, "STATIC_IMAGES_FOLDER", images)
-    monkeypatch.setattr(flask_app, "STATIC_REPORTS_FOLDER", reports)
-    monkeypatch.setattr(flask_app, "UPLOAD_ROOT", upload.resolve())
-    monkeypatch.setattr(flask_app, "RETENTION_AGE", timedelta(seconds=0.1))
-    monkeypatch.setattr(flask_app, "CLEANUP_INTERVAL", timedelta(seconds=0))
-    monkeypatch.setattr(flask_app, "RATE_LIMIT_REQUESTS", 30)
-    monkeypatch.setattr(flask_app, "RATE_LIMIT_WINDOW_SECONDS", 60.0)
+@pytest.fixture(autouse=True)
+def reset_state(temp_app, temp_dirs):
+    for path in temp_dirs.values():
+        shutil.rmtree(path, ignore_errors=True)
+        # Parents survive the rmtree of each leaf, so no parents=True walk.
+        path.mkdir()
+    # Reconfigure in place rather than allocating a fresh limiter per test;
+    # this also restores the defaults after tests that tighten the limits.
+    flask_app.rate_limiter.reconfigure(30, 60.0)
+    flask_app._LAST_CLEANUP_MONO = 0.0
+    yield
+    flask_app.reset_rate_limits()
 
-    flask_app.app.config["UPLOAD_FOLDER"] = str(upload)
-    flask_app.app.config["LAST_CLEANUP_AT"] = None
-    flask_app.rate_limiter = flask_app.InMemoryRateLimiter(30, 60.0)
 
-    yield flask_app.app
+@pytest.fixture(scope="module")
+def client(temp_app):
+    return temp_app.test_client()
 
 
-def _get_csrf(client):
-    response = client.get("/")
-    assert response.status_code == 200
+def seed_csrf(client, token="t" * 32):
+    # Write the token straight into the session; a GET / round trip per
+    # test just to obtain one renders the full upload page each time.
     with client.session_transaction() as sess:
-        return sess["csrf_token"]
+        sess["csrf_token"] = token
+    return token
+
+
+def post_preview(client, body, name="data.csv", follow_redirects=True):
+    # Callers that only need the side effect (the saved upload) pass
+    # follow_redirects=False to skip re-dispatching and rendering the
+    # redirect target.
+    token = seed_csrf(client)
+    return client.post(
+        "/preview",
+        data={"csrf_token": token, "file": (io.BytesIO(body), name)},
+        content_type="multipart/form-data",
+        follow_redirects=follow_redirects,
+    )
 
 
-def test_csrf_is_required(temp_app):
-    client = temp_app.test_client()
+def test_csrf_is_required(client):
     resp = client.post("/preview", data={}, follow_redirects=True)
     assert resp.status_code == 200
     assert b"Invalid or missing CSRF token" in resp.data
 
 
-def test_preview_succeeds_with_csrf_and_file(temp_app, tmp_path):
-    client = temp_app.test_client()
-    token = _get_csrf(client)
-    csv_bytes = b"value,name\n1,A\n2,B\n"
-    data = {
-        "csrf_token": token,
-        "file": (io.BytesIO(csv_bytes), "data.csv"),
-    }
-
-    resp = client.post("/preview", data=data, content_type="multipart/form-data", follow_redirects=True)
+@pytest.mark.parametrize(
+    "body, name, expected, uploads",
+    [
+        (CSV_TWO_COLS, "data.csv", [b"Data Preview", b"value"], 1),
+        (CSV_BAD, "bad.csv", [b"Error reading CSV file"], 0),
+    ],
+    ids=["valid", "malformed"],
+)
+def test_preview_outcomes(client, temp_dirs, body, name, expected, uploads):
+    resp = post_preview(client, body, name)
     assert resp.status_code == 200
-    assert b"Data Preview" in resp.data
-    assert b"value" in resp.data
+    for fragment in expected:
+        assert fragment in resp.data
 
-    upload_files = list((tmp_path / "uploads").iterdir())
-    assert len(upload_files) == 1
+    upload_files = os.listdir(temp_dirs["upload"])
+    assert len(upload_files) == uploads
 
 
-def test_analyze_flow_creates_outputs(temp_app, tmp_path):
-    client = temp_app.test_client()
-    token = _get_csrf(client)
-    csv_bytes = b"value\n1\n2\n3\n"
-    data = {
-        "csrf_token": token,
-        "file": (io.BytesIO(csv_bytes), "values.csv"),
-    }
-    resp = client.post("/preview", data=data, content_type="multipart/form-data", follow_redirects=True)
-    assert resp.status_code == 200
+def test_analyze_flow_creates_outputs(client, temp_dirs):
+    resp = post_preview(client, CSV_ONE_COL, "values.csv", follow_redirects=False)
+    assert resp.status_code in (200, 302)
+    token = seed_csrf(client)
 
-    upload_files = list((tmp_path / "uploads").iterdir())
+    upload_files = os.listdir(temp_dirs["upload"])
     assert upload_files, "Expected uploaded file to exist"
-    filename = upload_files[0].name
+    filename = upload_files[0]
 
-    token = _get_csrf(client)
     resp = client.post(
         "/analyze",
         data={"filename": filename, "column": "value", "csrf_token": token},
@@ -96,14 +137,65 @@ def test_analyze_flow_creates_outputs(temp_app, tmp_path):
     )
     assert resp.status_code == 302  # Redirect to results
 
-    images = list((tmp_path / "static" / "images").glob("benford_plot_*.png"))
-    reports = list((tmp_path / "static" / "reports").glob("benford_report_*.txt"))
+    images = fnmatch.filter(os.listdir(temp_dirs["images"]), "benford_plot_*.png")
+    reports = fnmatch.filter(os.listdir(temp_dirs["reports"]), "benford_report_*.txt")
     assert images, "Expected plot image to be created"
     assert reports, "Expected report file to be created"
 
 
-def test_cleanup_removes_old_files(temp_app, tmp_path, monkeypatch):
-    old_file = (tmp_path / "uploads" / "old.csv")
+def test_job_status_unknown_id(client):
+    resp = client.get("/jobs/does-not-exist", follow_redirects=True)
+    assert resp.status_code == 200
+    assert b"Analysis job not found" in resp.data
+
+
+def test_slow_analysis_hands_off_to_job_polling(client, temp_dirs, monkeypatch):
+    # Force the handoff path: the request never waits for the future, and
+    # the analysis blocks on an event until the test releases it.
+    monkeypatch.setattr(flask_app, "JOB_WAIT_SECONDS", 0.0)
+    release = threading.Event()
+    real_run = flask_app.BenfordAnalyzer.run
+
+    def slow_run(self):
+        release.wait(5.0)
+        return real_run(self)
+
+    monkeypatch.setattr(flask_app.BenfordAnalyzer, "run", slow_run)
+
+    post_preview(client, CSV_ONE_COL, "values.csv", follow_redirects=False)
+    filename = os.listdir(temp_dirs["upload"])[0]
+    token = seed_csrf(client)
+
+    resp = client.post(
+        "/analyze",
+        data={"filename": filename, "column": "value", "csrf_token": token},
+        follow_redirects=False,
+    )
+    assert resp.status_code == 302
+    location = resp.headers["Location"]
+    assert "/jobs/" in location
+
+    resp = client.get(location)
+    assert resp.status_code == 202
+
+    release.set()
+    for _ in range(50):
+        resp = client.get(location)
+        if resp.status_code != 202:
+            break
+        time.sleep(0.1)
+    assert resp.status_code == 302
+    assert "/results" in resp.headers["Location"]
+
+    # The job was consumed by the successful poll; a second poll (e.g. a
+    # stale tab) must get the not-found flash, not a KeyError 500.
+    resp = client.get(location, follow_redirects=True)
+    assert resp.status_code == 200
+    assert b"Analysis job not found" in resp.data
+
+
+def test_cleanup_removes_old_files(temp_dirs):
+    old_file = temp_dirs["upload"] / "old.csv"
     old_file.write_text("value\n1\n")
     stale_time = time.time() - 3600
     os.utime(old_file, times=(stale_time, stale_time))
@@ -113,11 +205,10 @@ def test_cleanup_removes_old_files(temp_app, tmp_path, monkeypatch):
     assert not old_file.exists(), "Old file should have been removed by cleanup"
 
 
-def test_rate_limiting_blocks_after_threshold(temp_app, monkeypatch):
-    flask_app.rate_limiter = flask_app.InMemoryRateLimiter(2, 60.0)
+def test_rate_limiting_blocks_after_threshold(client):
+    flask_app.rate_limiter.reconfigure(2, 60.0)
 
-    client = temp_app.test_client()
-    token = _get_csrf(client)
+    token = seed_csrf(client)
 
     data = {"csrf_token": token}
     for _ in range(2):
@@ -138,33 +229,56 @@ def test_analyzer_rejects_non_numeric(tmp_path):
         analyzer.run()
 
 
-def test_malformed_csv_preview(temp_app):
-    client = temp_app.test_client()
-    token = _get_csrf(client)
-    data = {
-        "csrf_token": token,
-        "file": (io.BytesIO(b"\xff\xff\x00\x00notcsv"), "bad.csv"),
-    }
-    resp = client.post("/preview", data=data, content_type="multipart/form-data", follow_redirects=True)
-    assert resp.status_code == 200
-    assert b"Error reading CSV file" in resp.data
-
-
-def test_large_file_rejected(temp_app, monkeypatch):
+def test_large_file_rejected(client, temp_app, monkeypatch):
     # Set a tiny limit for the test
     monkeypatch.setattr(flask_app, "MAX_FILE_SIZE", 10)
-    temp_app.config["MAX_CONTENT_LENGTH"] = 10
+    monkeypatch.setitem(temp_app.config, "MAX_CONTENT_LENGTH", 10)
 
-    client = temp_app.test_client()
-    token = _get_csrf(client)
-    payload = b"x" * 50  # exceeds limit
-    data = {"csrf_token": token, "file": (io.BytesIO(payload), "big.csv")}
-    resp = client.post("/preview", data=data, content_type="multipart/form-data", follow_redirects=True)
+    resp = post_preview(client, b"x" * 50, "big.csv")  # exceeds limit
     # Flask returns 413 and our handler redirects with flash
     assert resp.status_code == 200
     assert b"File is too large" in resp.data
 
 
+def test_raw_upload_requires_csrf(client):
+    resp = client.post(
+        "/upload/raw",
+        data=CSV_ONE_COL,
+        content_type="text/csv",
+        headers={"X-Filename": "vals.csv"},
+        follow_redirects=True,
+    )
+    assert resp.status_code == 200
+    assert b"Invalid or missing CSRF token" in resp.data
+
+
+def test_raw_upload_rejects_wrong_content_type(client):
+    token = seed_csrf(client)
+    resp = client.post(
+        "/upload/raw",
+        data=CSV_ONE_COL,
+        content_type="text/plain",
+        headers={"X-CSRF-Token": token, "X-Filename": "vals.csv"},
+        follow_redirects=True,
+    )
+    assert resp.status_code == 200
+    assert b"Raw uploads must be sent as text/csv" in resp.data
+
+
+def test_raw_upload_saves_and_previews(client, temp_dirs):
+    token = seed_csrf(client)
+    resp = client.post(
+        "/upload/raw",
+        data=CSV_TWO_COLS,
+        content_type="text/csv",
+        headers={"X-CSRF-Token": token, "X-Filename": "vals.csv"},
+        follow_redirects=True,
+    )
+    assert resp.status_code == 200
+    assert b"Data Preview" in resp.data
+    assert len(os.listdir(temp_dirs["upload"])) == 1
+
+
 def test_kaggle_credential_encrypt_decrypt():
     secret = "supersecret"
     token = external_data.encrypt_credentials(secret, {"username": "user", "key": "abcd1234ef"})
@@ -181,9 +295,8 @@ def test_validate_dataset_ref():
         external_data.validate_dataset_ref(bad)
 
 
-def test_learn_page_loads(temp_app):
+def test_learn_page_loads(client):
     """Test that the /learn route loads successfully."""
-    client = temp_app.test_client()
     resp = client.get("/learn")
     assert resp.status_code == 200
     assert b"Understanding Benford's Law" in resp.data
@@ -192,9 +305,8 @@ def test_learn_page_loads(temp_app):
     assert b"Real-World Applications" in resp.data
 
 
-def test_examples_page_loads(temp_app):
+def test_examples_page_loads(client):
     """Test that the /examples route loads with example datasets."""
-    client = temp_app.test_client()
     resp = client.get("/examples")
     assert resp.status_code == 200
     assert b"Explore Example Datasets" in resp.data
@@ -230,7 +342,7 @@ def test_interpretation_module():
     assert "did not return a p-value" in result["detail"]
 
 
-def test_example_analysis_requires_csrf(temp_app, monkeypatch):
+def test_example_analysis_requires_csrf(client, monkeypatch):
     """Test that example analysis endpoint requires CSRF token."""
     # Mock example datasets - don't need real CSV for CSRF test
     mock_examples = [
@@ -244,15 +356,13 @@ def test_example_analysis_requires_csrf(temp_app, monkeypatch):
     ]
     monkeypatch.setattr(flask_app, "EXAMPLE_DATASETS", mock_examples)
 
-    client = temp_app.test_client()
-
     # Test without CSRF - should fail and redirect
     resp = client.post("/examples/analyze/test_example", data={}, follow_redirects=True)
     assert resp.status_code == 200
     assert b"Invalid or missing CSRF token" in resp.data
 
 
-def test_example_download(temp_app, monkeypatch):
+def test_example_download(client, monkeypatch):
     """Test that example datasets can be downloaded."""
     # Mock example datasets
     mock_examples = [
@@ -274,7 +384,6 @@ def test_example_download(temp_app, monkeypatch):
 
     monkeypatch.setattr(flask_app, "EXAMPLES_ROOT", examples_folder.resolve())
 
-    client = temp_app.test_client()
     resp = client.get("/examples/download/download_test")
     assert resp.status_code == 200
     assert resp.headers["Content-Disposition"]